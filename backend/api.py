@@ -1,12 +1,13 @@
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-import sys
+import asyncio
+from contextlib import asynccontextmanager
+import hashlib
 import pandas as pd
-from typing import Optional, List, Dict, Any
+from cachetools import TTLCache
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
 from collections import Counter
 import warnings
 import logging
@@ -14,22 +15,31 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
-# Add parent directory to path to import from main.py
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import main
-
-# Load environment variables
-load_dotenv()
+from clients import openai_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Precompute candidate skills on startup and close pooled OpenAI connections on shutdown"""
+    try:
+        df = await main.load_candidates()
+        logger.info(f"Precomputed skills for {len(df)} candidates")
+    except Exception as e:
+        logger.error(f"Error precomputing candidate skills: {str(e)}")
+    yield
+    await openai_client.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Hiring Wizard API",
     description="API for AI-powered hiring copilot",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -41,8 +51,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# In-memory TTL caches for the idempotent lookup endpoints, keyed by a hash of the input
+SKILLS_CACHE = TTLCache(maxsize=10_000, ttl=86400)
+EXPERIENCE_CACHE = TTLCache(maxsize=10_000, ttl=86400)
+LOCATION_CACHE = TTLCache(maxsize=10_000, ttl=86400)
+
+# Per-key [lock, users] entries so concurrent requests for the same uncached input compute it once
+_cache_locks: Dict[Tuple[int, bytes], list] = {}
+
+async def cached_lookup(cache: TTLCache, text: str, compute: Callable[[], Awaitable[Any]], cache_empty: bool = True) -> Any:
+    """Return the cached result for text, computing and storing it on a miss
+
+    Exceptions from compute propagate and are never cached; empty results are
+    skipped too when cache_empty is False.
+    """
+    key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    if key in cache:
+        return cache[key]
+
+    lock_key = (id(cache), key)
+    entry = _cache_locks.setdefault(lock_key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            if key in cache:
+                return cache[key]
+            result = await compute()
+            if result or cache_empty:
+                cache[key] = result
+            return result
+    finally:
+        # Drop the lock only once no request is holding or waiting for it
+        entry[1] -= 1
+        if entry[1] == 0 and _cache_locks.get(lock_key) is entry:
+            del _cache_locks[lock_key]
 
 # Pydantic models for request/response
 class JobQuery(BaseModel):
@@ -87,15 +129,12 @@ class OutreachRequest(BaseModel):
     candidateName: str
     candidateResume: str
 
-class OutreachResponse(BaseModel):
-    generatedMessage: str
-
 # API Routes
 @app.post("/api/match", response_model=MatchResponse)
 async def get_candidate_match(query: JobQuery):
     """Get match score between job requirements and candidate profile"""
     try:
-        score, skills, explanation = main.get_candidate_match_score(
+        score, skills, explanation = await main.get_candidate_match_score(
             query.query,
             query.candidate_profile or ""
         )
@@ -111,43 +150,48 @@ async def get_candidate_match(query: JobQuery):
 async def extract_skills(resume: str = Query(..., description="Resume text to extract skills from")):
     """Extract skills from resume text"""
     try:
-        skills = main.extract_skills_from_resume(resume)
+        # Empty skills mean extraction failed, so they are not cached
+        skills = await cached_lookup(
+            SKILLS_CACHE, resume, lambda: main.extract_skills_from_resume(resume), cache_empty=False
+        )
         return SkillsResponse(skills=skills)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Largest page of candidates served by /api/candidates
+MAX_CANDIDATES_LIMIT = 200
+
 @app.get("/api/candidates", response_model=List[CandidateResponse])
-async def get_candidates():
-    """Get all candidates from the database"""
+async def get_candidates(
+    offset: int = Query(0, ge=0, description="Number of candidates to skip"),
+    limit: int = Query(50, ge=1, description=f"Maximum number of candidates to return (capped at {MAX_CANDIDATES_LIMIT})")
+):
+    """Get a page of candidates from the database"""
     try:
         logger.info("Loading resumes from database...")
-        df = main.load_resumes()
+        df = await main.load_candidates()
         logger.info(f"Loaded {len(df)} candidates from database")
         
         if df.empty:
             logger.info("No candidates found in database")
             return []
         
-        # Process each candidate
-        candidates = []
-        for _, row in df.iterrows():
-            # Extract skills from resume
-            resume = row.get('Resume', '')
-            skills = main.extract_skills_from_resume(resume)
-            
-            candidate = CandidateResponse(
-                name=row.get('Name', ''),
-                phone=row.get('Phone', ''),
-                country=row.get('Country', ''),
-                open_to=row.get('Open To', ''),
-                email=row.get('Email', ''),
-                resume=resume,
+        page = df.iloc[offset:offset + min(limit, MAX_CANDIDATES_LIMIT)]
+        records = page[['Name', 'Phone', 'Country', 'Open To', 'Email', 'Resume', 'Skills']].fillna('').to_dict('records')
+        candidates = [
+            CandidateResponse(
+                name=record['Name'],
+                phone=record['Phone'],
+                country=record['Country'],
+                open_to=record['Open To'],
+                email=record['Email'],
+                resume=record['Resume'],
                 score=0,  # Will be calculated when matched
-                skills=skills,  # Use extracted skills
+                skills=record['Skills'],  # Precomputed skills
                 explanation=''  # Will be generated when matched
             )
-            candidates.append(candidate)
-            logger.info(f"Processed candidate: {candidate.name}")
+            for record in records
+        ]
         
         logger.info(f"Returning {len(candidates)} candidates")
         return candidates
@@ -159,9 +203,13 @@ async def get_candidates():
 async def extract_location(query: str = Query(..., description="Query to extract location from")):
     """Extract location from query"""
     try:
-        df = main.load_resumes()
-        country_list = df['Country'].dropna().unique().tolist()
-        location = main.extract_location_from_query(query, country_list)
+        country_list = main.load_countries()
+        skill_vocabulary = await main.load_skill_vocabulary()
+        location = await cached_lookup(
+            LOCATION_CACHE,
+            query + "\0" + ",".join(country_list),
+            lambda: main.extract_location_from_query(query, country_list, skill_vocabulary)
+        )
         return LocationResponse(location=location)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -171,7 +219,7 @@ async def get_experience_years(resume: str = Query(..., description="Resume text
     """Get estimated years of experience from resume"""
     try:
         # This function is defined in main.py
-        years = main.get_experience_years(resume)
+        years = await cached_lookup(EXPERIENCE_CACHE, resume, lambda: main.get_experience_years(resume))
         return {"experience": years}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -180,33 +228,25 @@ async def get_experience_years(resume: str = Query(..., description="Resume text
 async def search_candidates(query: SearchQuery):
     try:
         logger.info(f"Received search query: {query.query}")
-        candidates = main.search_candidates(query.query)
+        candidates = await main.search_candidates(query.query)
         logger.info(f"Found {len(candidates)} candidates")
         return candidates
     except Exception as e:
         logger.error(f"Error in search_candidates: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/outreach", response_model=OutreachResponse)
+@app.post("/api/outreach", response_class=StreamingResponse)
 async def generate_outreach(request: OutreachRequest):
     try:
         logger.info(f"Generating outreach message for {request.candidateName}")
         logger.info(f"Request data: {request.dict()}")
         
-        # Extract key information from the resume
-        try:
-            skills = main.extract_skills_from_resume(request.candidateResume)
-            logger.info(f"Extracted skills: {skills}")
-        except Exception as e:
-            logger.error(f"Error extracting skills: {str(e)}")
-            skills = "Skills extraction failed"
-
-        try:
-            experience_years = main.get_experience_years(request.candidateResume)
-            logger.info(f"Extracted experience years: {experience_years}")
-        except Exception as e:
-            logger.error(f"Error extracting experience years: {str(e)}")
-            experience_years = "Experience extraction failed"
+        # Extract key information from the resume in a single lookup
+        profile = await main.extract_profile(request.candidateResume)
+        skills = profile["skills"] or "Skills extraction failed"
+        experience_years = profile["years"] if profile["years"] is not None else "Experience extraction failed"
+        logger.info(f"Extracted skills: {skills}")
+        logger.info(f"Extracted experience years: {experience_years}")
         
         # Create a more detailed prompt for the LLM
         prompt = f"""As a professional recruiter, write a personalized outreach email to {request.candidateName}.
@@ -232,20 +272,30 @@ Write a professional, personalized email that:
 Format the response as a complete email with proper greeting and sign-off. Make it sound natural and personalized, not template-like."""
 
         logger.info("Sending request to OpenAI")
-        # Generate message using OpenAI
-        response = client.chat.completions.create(
+        # Generate message using OpenAI, streaming tokens as they arrive
+        stream = await main.create_chat_completion(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a professional recruiter writing personalized outreach emails. Your goal is to write engaging, personalized emails that show you've reviewed the candidate's background and are genuinely interested in their profile."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=800
+            max_tokens=800,
+            stream=True
         )
 
-        generated_message = response.choices[0].message.content
-        logger.info(f"Successfully generated outreach message for {request.candidateName}")
-        return OutreachResponse(generatedMessage=generated_message)
+        async def generate_message():
+            try:
+                async for chunk in stream:
+                    if chunk.choices:
+                        yield chunk.choices[0].delta.content or ""
+                logger.info(f"Successfully generated outreach message for {request.candidateName}")
+            except Exception as e:
+                # Headers are already sent, so flag the truncated message in the body
+                logger.error(f"Error streaming outreach message: {str(e)}")
+                yield "\n\n[Error: outreach message generation was interrupted]"
+
+        return StreamingResponse(generate_message(), media_type="text/plain; charset=utf-8")
 
     except Exception as e:
         logger.error(f"Error generating outreach: {str(e)}")
@@ -0,0 +1,20 @@
+"""Build Data/cv_db.parquet from the resume CSV with a precomputed Skills column.
+
+Run from the backend directory whenever the CSV changes:
+
+    python build_db.py
+"""
+import asyncio
+import pandas as pd
+
+import main
+
+async def build_db():
+    """Extract skills for every resume once and write the Parquet database"""
+    df = pd.read_csv(main.RESUMES_CSV_PATH, dtype=str)
+    df['Skills'] = await main.get_skills_for_resumes(df['Resume'].fillna('').tolist())
+    df.to_parquet(main.RESUMES_PARQUET_PATH, index=False)
+    print(f"Wrote {len(df)} candidates to {main.RESUMES_PARQUET_PATH}")
+
+if __name__ == "__main__":
+    asyncio.run(build_db())
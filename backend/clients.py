@@ -0,0 +1,18 @@
+import os
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+# Load environment variables
+load_dotenv()
+
+# Shared OpenAI client with a pooled, keep-alive HTTP client for concurrent requests.
+# Retries are handled by main.create_chat_completion, so the SDK's own are disabled.
+openai_client = AsyncOpenAI(
+    api_key=os.getenv('OPENAI_API_KEY'),
+    max_retries=0,
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(60.0)
+    )
+)
@@ -1,11 +1,78 @@
 import pandas as pd
 import os
-from openai import OpenAI
-from typing import Tuple, List
-import json
+import ahocorasick
+import asyncio
+import datetime
+import re
+import functools
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple, List
+import orjson
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from clients import openai_client
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Small, fast model for deterministic extraction calls
+EXTRACTION_MODEL = "gpt-4o-mini"
+
+# Maximum number of OpenAI requests in flight at once, to stay under RPM limits
+MAX_CONCURRENT_REQUESTS = 20
+_request_semaphore: Optional[asyncio.Semaphore] = None
+
+# Skills are extracted with a local token-classification model; set to "llm" to use OpenAI instead
+SKILLS_EXTRACTOR = os.getenv('SKILLS_EXTRACTOR', 'local')
+SKILLS_MODEL = os.getenv('SKILLS_MODEL', 'jjzha/jobbert_skill_extraction')
+# Longest input, in tokens, the skills model accepts; longer resumes are split into windows
+SKILLS_MODEL_MAX_TOKENS = 512
+
+# Extracted skills are persisted here, keyed by a hash of the resume text
+SKILLS_CACHE_PATH = os.getenv(
+    'SKILLS_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Data', '.skills_cache.sqlite')
+)
+# Empty results (failed extraction or no skills found) are only retried after this many seconds
+EMPTY_SKILLS_RETRY_SECONDS = 3600
+
+# Optional month before a year, e.g. "Jan ", "March " or "03/"
+_MONTH = r'(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+|\d{1,2}/)?'
+# Date ranges such as "2019 - 2022", "Jan 2019 - Mar 2021", "2015 to present" or "2018–Current"
+YEAR_RANGE_RE = re.compile(
+    rf'\b{_MONTH}((?:19|20)\d{{2}})\s*(?:-|–|—|to)\s*(?:{_MONTH}((?:19|20)\d{{2}})|(present|current|now))\b',
+    re.IGNORECASE
+)
+# Explicit statements such as "5+ years experience" or "7 years of professional experience"
+YEARS_STATED_RE = re.compile(
+    r'\b(\d{1,2})\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:[a-z-]+\s+)?experience\b',
+    re.IGNORECASE
+)
+
+# Phrases and regions that signal a location the country automaton may not resolve
+LOCATION_CUE_RE = re.compile(
+    r'\b(?:based|located|living|residing|relocat\w*)\s+(?:in|to)\b'
+    r'|\b(?:location|country|countries|region|continent|europe\w*|asia\w*|africa\w*|americas?'
+    r'|latin america|latam|emea|apac|oceania|middle east|scandinavia\w*|nordics?)\b',
+    re.IGNORECASE
+)
+# Common country nicknames and abbreviations, matched case-insensitively as whole words
+LOCATION_ALIAS_RE = re.compile(
+    r'(?<![\w.])(?:u\.?s\.?a?\.?|united states|america|states|u\.?k\.?|britain|great britain|england'
+    r'|scotland|wales|holland|aussie|oz|emirates|uae)(?![\w.])',
+    re.IGNORECASE
+)
+# Words after a preposition, e.g. "in peru" or "from the UK"
+PLACE_NAME_RE = re.compile(
+    r'\b(?:in|from|near)\s+(?:the\s+)?([a-z][\w.+#-]*)(?:\s+([a-z][\w.+#-]*))?',
+    re.IGNORECASE
+)
+# Words after a preposition that are not places
+NON_PLACE_WORDS = frozenset({
+    "a", "an", "our", "their", "my", "your", "this", "that", "these", "those", "any", "all", "both",
+    "production", "development", "building", "working", "house", "office", "person", "time", "charge",
+    "depth", "addition", "order", "general", "practice", "various", "team", "teams", "scratch", "industry"
+})
 
 # Sample candidate data
 SAMPLE_CANDIDATES = [
@@ -35,23 +102,206 @@ SAMPLE_CANDIDATES = [
     }
 ]
 
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential_jitter(1, 30),
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)),
+    reraise=True
+)
+async def create_chat_completion(**kwargs):
+    """Call the OpenAI chat completions API, bounded by the global concurrency limit
+
+    Rate limits, connection errors, timeouts and 5xx responses are retried with
+    jittered exponential backoff; the concurrency slot is released while waiting.
+    """
+    global _request_semaphore
+    # Created lazily so the semaphore binds to the running event loop
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with _request_semaphore:
+        return await openai_client.chat.completions.create(**kwargs)
+
+def _data_path(filename: str) -> str:
+    """Get the absolute path to a file in the Data directory"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parent_dir = os.path.dirname(current_dir)
+    return os.path.join(parent_dir, 'Data', filename)
+
+# Source CSV, and the Parquet copy with precomputed skills written by build_db.py
+RESUMES_CSV_PATH = _data_path('small_CV_DB.csv')
+RESUMES_PARQUET_PATH = _data_path('cv_db.parquet')
+
+def _resumes_source_path() -> str:
+    """Use the Parquet database unless it is missing or older than the CSV"""
+    if not os.path.exists(RESUMES_PARQUET_PATH):
+        return RESUMES_CSV_PATH
+    if (not os.path.exists(RESUMES_CSV_PATH)
+            or os.path.getmtime(RESUMES_PARQUET_PATH) >= os.path.getmtime(RESUMES_CSV_PATH)):
+        return RESUMES_PARQUET_PATH
+    return RESUMES_CSV_PATH
+
+@functools.lru_cache(maxsize=1)
+def _read_resumes(path: str, mtime: float) -> pd.DataFrame:
+    """Read the resume database; cached per file modification time"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype=str)
+
+@functools.lru_cache(maxsize=1)
+def _read_countries(path: str, mtime: float) -> List[str]:
+    """Read only the Country column; cached per file modification time"""
+    if path.endswith('.parquet'):
+        countries = pd.read_parquet(path, columns=['Country'])['Country']
+    else:
+        countries = pd.read_csv(path, usecols=['Country'], dtype=str)['Country']
+    return countries.dropna().unique().tolist()
+
 def load_resumes() -> pd.DataFrame:
-    """Load candidate resumes from the database"""
+    """Load candidate resumes from the database
+
+    The DataFrame is cached in memory and only re-read when the file changes,
+    so callers must not modify it in place.
+    """
     try:
-        # Get the absolute path to the CSV file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        csv_path = os.path.join(parent_dir, 'Data', 'small_CV_DB.csv')
-        
-        # Load the CSV file
-        df = pd.read_csv(csv_path)
-        return df
+        path = _resumes_source_path()
+        return _read_resumes(path, os.path.getmtime(path))
     except Exception as e:
         print(f"Error loading resumes: {str(e)}")
         # Fallback to sample data if CSV loading fails
         return pd.DataFrame(SAMPLE_CANDIDATES)
 
-def get_candidate_match_score(query: str, candidate_profile: str) -> Tuple[int, str, str]:
+def load_countries() -> List[str]:
+    """Load the distinct candidate countries without parsing the resumes"""
+    try:
+        path = _resumes_source_path()
+        return _read_countries(path, os.path.getmtime(path))
+    except Exception as e:
+        print(f"Error loading countries: {str(e)}")
+        return list(dict.fromkeys(candidate["Country"] for candidate in SAMPLE_CANDIDATES))
+
+def _resume_key(resume: str) -> str:
+    """Cache key for a resume's text"""
+    return hashlib.sha1(resume.encode()).hexdigest()
+
+def _open_skills_cache() -> sqlite3.Connection:
+    """Open the persistent skills cache, creating it if needed"""
+    conn = sqlite3.connect(SKILLS_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS resume_skills "
+        "(key TEXT PRIMARY KEY, skills TEXT NOT NULL, extracted_at REAL NOT NULL)"
+    )
+    return conn
+
+def _read_cached_skills(keys: List[str]) -> dict:
+    """Read persisted skills for the given resume keys, skipping expired empty results"""
+    retry_before = time.time() - EMPTY_SKILLS_RETRY_SECONDS
+    unique_keys = list(set(keys))
+    cached = {}
+    conn = _open_skills_cache()
+    try:
+        # Stay well under SQLite's limit on query parameters
+        for start in range(0, len(unique_keys), 500):
+            batch = unique_keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, skills, extracted_at FROM resume_skills WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            cached.update({key: skills for key, skills, extracted_at in rows if skills or extracted_at >= retry_before})
+        return cached
+    finally:
+        conn.close()
+
+def _write_skills(skills_by_key: dict) -> None:
+    """Persist extracted skills, recording when each was extracted"""
+    extracted_at = time.time()
+    conn = _open_skills_cache()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO resume_skills (key, skills, extracted_at) VALUES (?, ?, ?)",
+                [(key, skills, extracted_at) for key, skills in skills_by_key.items()]
+            )
+    finally:
+        conn.close()
+
+async def _get_cached_skills(keys: List[str]) -> dict:
+    """Look up persisted skills off the event loop; cache errors behave as misses"""
+    try:
+        return await asyncio.to_thread(_read_cached_skills, keys)
+    except sqlite3.Error as e:
+        print(f"Error reading skills cache: {str(e)}")
+        return {}
+
+async def _store_skills(skills_by_key: dict) -> None:
+    """Persist extracted skills off the event loop; cache errors are only logged"""
+    try:
+        await asyncio.to_thread(_write_skills, skills_by_key)
+    except sqlite3.Error as e:
+        print(f"Error writing skills cache: {str(e)}")
+
+async def get_skills_for_resumes(resumes: List[str]) -> List[str]:
+    """Get skills for each resume, only calling the LLM for resumes not seen before
+
+    Empty results are cached too, so resumes without detectable skills (or whose
+    extraction failed) are only retried after EMPTY_SKILLS_RETRY_SECONDS.
+    """
+    keys = [_resume_key(resume) for resume in resumes]
+    cached = await _get_cached_skills(keys)
+
+    # Extract each distinct uncached resume once
+    missing = {key: resume for key, resume in zip(keys, resumes) if key not in cached}
+    if missing:
+        extracted = dict(zip(missing, await extract_skills_batch(list(missing.values()))))
+        await _store_skills(extracted)
+        cached.update(extracted)
+    return [cached.get(key, "") for key in keys]
+
+def _skill_set(skills: str) -> frozenset:
+    """Normalize a comma-separated skills string into a set for overlap checks"""
+    return frozenset(skill.strip().lower() for skill in skills.split(',') if skill.strip())
+
+_candidates_cache = {"source": None, "frame": None, "skill_vocabulary": (), "checked_at": 0.0}
+
+async def load_candidates() -> pd.DataFrame:
+    """Load candidate resumes with precomputed Skills and SkillSet columns
+
+    Rebuilt when load_resumes returns a new DataFrame; resumes left without
+    skills are looked up again at most every EMPTY_SKILLS_RETRY_SECONDS.
+    Callers must not modify the result in place.
+    """
+    df = load_resumes()
+    now = time.time()
+    if _candidates_cache["source"] is df:
+        frame = _candidates_cache["frame"]
+        if now - _candidates_cache["checked_at"] < EMPTY_SKILLS_RETRY_SECONDS:
+            return frame
+    else:
+        frame = df.copy()
+        if 'Skills' not in frame.columns:
+            # Parquet databases built by build_db.py already include skills
+            frame['Skills'] = ''
+
+    # Look up skills for resumes that have none yet, including earlier failures
+    missing = frame['Skills'].fillna('').eq('') & frame['Resume'].fillna('').str.strip().ne('')
+    skills = await get_skills_for_resumes(frame.loc[missing, 'Resume'].tolist()) if missing.any() else []
+    if _candidates_cache["source"] is df and not any(skills):
+        _candidates_cache["checked_at"] = now
+        return frame
+
+    frame = frame.copy()
+    if missing.any():
+        frame.loc[missing, 'Skills'] = skills
+    frame['SkillSet'] = frame['Skills'].fillna('').map(_skill_set)
+    vocabulary = tuple(sorted(frozenset().union(*frame['SkillSet'])))
+    _candidates_cache.update(source=df, frame=frame, skill_vocabulary=vocabulary, checked_at=now)
+    return frame
+
+async def load_skill_vocabulary() -> Tuple[str, ...]:
+    """Load the sorted, normalized skills found across all candidates"""
+    await load_candidates()
+    return _candidates_cache["skill_vocabulary"]
+
+async def get_candidate_match_score(query: str, candidate_profile: str) -> Tuple[int, str, str]:
     """Get match score between job requirements and candidate profile"""
     try:
         # Create the prompt for the LLM
@@ -78,25 +328,173 @@ def get_candidate_match_score(query: str, candidate_profile: str) -> Tuple[int,
         """
         
         # Call OpenAI API
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
             model="gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": "You are a hiring assistant that analyzes job-candidate matches."},
+                {"role": "system", "content": "You are a hiring assistant that analyzes job-candidate matches. Respond with a single JSON object."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7
+            temperature=0.7,
+            response_format={"type": "json_object"}
         )
         
         # Parse the response
-        result = json.loads(response.choices[0].message.content)
+        result = orjson.loads(response.choices[0].message.content)
         return result["score"], result["skills"], result["explanation"]
         
     except Exception as e:
         print(f"Error in get_candidate_match_score: {str(e)}")
         return 0, "", "Error processing match"
 
-def extract_skills_from_resume(resume: str) -> str:
+async def score_candidates_batch(query: str, candidates: List[dict], chunk_size: int = 15) -> List[dict]:
+    """Score many candidates against a query, one LLM call per chunk of candidates
+
+    Returns a {"score", "skills", "explanation"} dict for each candidate, in input order.
+    """
+    chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+    results = await asyncio.gather(*(_score_candidates_chunk(query, chunk) for chunk in chunks))
+    return [result for chunk_results in results for result in chunk_results]
+
+async def _score_candidates_chunk(query: str, candidates: List[dict]) -> List[dict]:
+    """Score a chunk of candidates with a single numbered ranking prompt"""
+    unscored = {"score": 0, "skills": "", "explanation": "Error processing match"}
+    try:
+        numbered = "\n\n".join(
+            f"Candidate {i}:\n{_candidate_profile(candidate)}" for i, candidate in enumerate(candidates, start=1)
+        )
+        prompt = f"""
+        Analyze how well each candidate matches the job requirements.
+        
+        Job Requirements:
+        {query}
+        
+        Candidates:
+        {numbered}
+        
+        For every candidate provide a match score (0-100), the key skills that match and a brief explanation.
+        Return a JSON object sorted by score, highest first, in this format:
+        {{"results": [{{"id": <candidate number>, "score": <score>, "skills": "<comma-separated skills>", "explanation": "<explanation>"}}]}}
+        """
+        
+        response = await create_chat_completion(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a hiring assistant that analyzes job-candidate matches. Respond with a single JSON object."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            response_format={"type": "json_object"}
+        )
+        
+        # Map results back by candidate number; missing entries are left unscored
+        results = orjson.loads(response.choices[0].message.content).get("results", [])
+        scored = {
+            int(item["id"]): {
+                "score": int(item.get("score", 0)),
+                "skills": str(item.get("skills", "")).strip(),
+                "explanation": str(item.get("explanation", "")).strip()
+            }
+            for item in results
+        }
+        return [scored.get(i, unscored) for i in range(1, len(candidates) + 1)]
+        
+    except Exception as e:
+        print(f"Error in score_candidates_batch: {str(e)}")
+        return [unscored] * len(candidates)
+
+# Loaded skills pipeline, or the error from the one failed load attempt
+_skills_pipeline_state = {"pipeline": None, "error": None}
+# Serializes the first load, since callers run in worker threads
+_skills_pipeline_lock = threading.Lock()
+
+def _use_local_skills() -> bool:
+    """Whether skills should come from the local model rather than the LLM"""
+    return SKILLS_EXTRACTOR == 'local' and _skills_pipeline_state["error"] is None
+
+def _get_skills_pipeline():
+    """Load the local skill extraction model, on the GPU if one is available
+
+    A failed load is remembered so later calls go straight to the LLM instead
+    of retrying the download.
+    """
+    with _skills_pipeline_lock:
+        if _skills_pipeline_state["error"] is not None:
+            raise _skills_pipeline_state["error"]
+        if _skills_pipeline_state["pipeline"] is None:
+            try:
+                # Imported lazily so the model stack is only loaded when it is used
+                import torch
+                from transformers import pipeline
+                _skills_pipeline_state["pipeline"] = pipeline(
+                    "token-classification",
+                    model=SKILLS_MODEL,
+                    device=0 if torch.cuda.is_available() else -1
+                )
+            except Exception as e:
+                _skills_pipeline_state["error"] = e
+                raise
+        return _skills_pipeline_state["pipeline"]
+
+def _split_into_windows(tokenizer, resume: str) -> List[Tuple[int, str]]:
+    """Split a resume into (character offset, text) windows that fit the model's input limit"""
+    # Leave room for the special tokens the pipeline adds
+    size = min(tokenizer.model_max_length, SKILLS_MODEL_MAX_TOKENS) - 2
+    offsets = tokenizer(resume, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    windows = []
+    for start in range(0, len(offsets), size):
+        window = offsets[start:start + size]
+        begin, end = window[0][0], window[-1][1]
+        windows.append((begin, resume[begin:end]))
+    return windows
+
+def _merge_skill_spans(resume: str, tokens: List[dict]) -> List[str]:
+    """Merge the model's B/I-tagged tokens into skill phrases
+
+    The model uses bare B/I labels, which the pipeline's own aggregation treats
+    as separate entity types, so spans are merged here by character offsets: a
+    token continues the previous skill when it is a subword of the same word or
+    an I tag separated from it only by whitespace.
+    """
+    spans = []
+    for token in sorted(tokens, key=lambda token: token["start"]):
+        if spans and (
+            token["start"] == spans[-1][1]
+            or (token["entity"] == "I" and not resume[spans[-1][1]:token["start"]].strip())
+        ):
+            spans[-1][1] = token["end"]
+        else:
+            spans.append([token["start"], token["end"]])
+    return [resume[start:end].strip() for start, end in spans if resume[start:end].strip()]
+
+def _extract_skills_locally(resumes: List[str]) -> List[str]:
+    """Extract skills from resumes in batches with the local model"""
+    pipe = _get_skills_pipeline()
+    windows = [
+        (index, offset, text)
+        for index, resume in enumerate(resumes)
+        for offset, text in _split_into_windows(pipe.tokenizer, resume)
+    ]
+    results = pipe([text for _, _, text in windows], batch_size=32) if windows else []
+
+    # Shift each window's token offsets back into the full resume before merging
+    tokens_by_resume = [[] for _ in resumes]
+    for (index, offset, _), tokens in zip(windows, results):
+        tokens_by_resume[index].extend(
+            {**token, "start": token["start"] + offset, "end": token["end"] + offset} for token in tokens
+        )
+    return [
+        ", ".join(dict.fromkeys(_merge_skill_spans(resume, tokens)))
+        for resume, tokens in zip(resumes, tokens_by_resume)
+    ]
+
+async def extract_skills_from_resume(resume: str) -> str:
     """Extract skills from resume text"""
+    if _use_local_skills():
+        try:
+            return (await asyncio.to_thread(_extract_skills_locally, [resume]))[0]
+        except Exception as e:
+            print(f"Error in local skills extraction, falling back to LLM: {str(e)}")
+
     try:
         prompt = f"""
         Extract technical skills from this resume:
@@ -105,13 +503,14 @@ def extract_skills_from_resume(resume: str) -> str:
         Return only a comma-separated list of skills.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = await create_chat_completion(
+            model=EXTRACTION_MODEL,
             messages=[
                 {"role": "system", "content": "You are a hiring assistant that extracts skills from resumes."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7
+            temperature=0,
+            max_tokens=256
         )
         
         return response.choices[0].message.content.strip()
@@ -120,8 +519,170 @@ def extract_skills_from_resume(resume: str) -> str:
         print(f"Error in extract_skills_from_resume: {str(e)}")
         return ""
 
-def extract_location_from_query(query: str, country_list: List[str]) -> str:
-    """Extract location from query"""
+async def extract_skills_batch(resumes: List[str], chunk_size: int = 20) -> List[str]:
+    """Extract skills from many resumes, with the local model or one LLM call per chunk"""
+    if _use_local_skills():
+        try:
+            return await asyncio.to_thread(_extract_skills_locally, resumes)
+        except Exception as e:
+            print(f"Error in local skills extraction, falling back to LLM: {str(e)}")
+
+    chunks = [resumes[start:start + chunk_size] for start in range(0, len(resumes), chunk_size)]
+    results = await asyncio.gather(*(_extract_skills_chunk(chunk) for chunk in chunks))
+    return [skills for chunk_skills in results for skills in chunk_skills]
+
+async def _extract_skills_chunk(resumes: List[str]) -> List[str]:
+    """Extract skills for a chunk of resumes with a single numbered prompt"""
+    try:
+        numbered = "\n".join(f"Resume {i}: {resume}" for i, resume in enumerate(resumes, start=1))
+        prompt = f"""
+        Extract technical skills from each of these resumes:
+        {numbered}
+        
+        Return a JSON object with one entry per resume, in this format:
+        {{"results": [{{"id": <resume number>, "skills": "<comma-separated skills>"}}]}}
+        """
+        
+        response = await create_chat_completion(
+            model=EXTRACTION_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a hiring assistant that extracts skills from resumes. Respond with a single JSON object."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0,
+            max_tokens=256 * len(resumes),
+            response_format={"type": "json_object"}
+        )
+        
+        # Map results back by resume number; missing entries get no skills
+        results = orjson.loads(response.choices[0].message.content).get("results", [])
+        skills_by_id = {int(item["id"]): str(item.get("skills", "")).strip() for item in results}
+        return [skills_by_id.get(i, "") for i in range(1, len(resumes) + 1)]
+        
+    except Exception as e:
+        print(f"Error in extract_skills_batch: {str(e)}")
+        return [""] * len(resumes)
+
+async def extract_profile(resume: str) -> dict:
+    """Extract skills and years of experience from a resume with at most one LLM call
+
+    Cached skills and regex-detected experience are used when available; the
+    LLM is only asked for both fields when either is missing.
+    """
+    key = _resume_key(resume)
+    skills = (await _get_cached_skills([key])).get(key)
+    if skills is None and _use_local_skills():
+        # The local model is cheap, so only experience may still need the LLM
+        skills = (await get_skills_for_resumes([resume]))[0] or None
+    years = estimate_experience_years(resume)
+    if skills is not None and years is not None:
+        return {"skills": skills, "years": years}
+
+    try:
+        prompt = f"""
+        Extract the technical skills and estimate the total years of professional experience from this resume:
+        {resume}
+        
+        Return a JSON object in this format:
+        {{"skills": "<comma-separated skills>", "years": <number of years>}}
+        """
+        
+        response = await create_chat_completion(
+            model=EXTRACTION_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a hiring assistant that extracts skills and experience from resumes. Respond with a single JSON object."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0,
+            max_tokens=320,
+            response_format={"type": "json_object"}
+        )
+        
+        result = orjson.loads(response.choices[0].message.content)
+        if skills is None:
+            skills = str(result.get("skills", "")).strip()
+            await _store_skills({key: skills})
+        if years is None and result.get("years") is not None:
+            years = int(result["years"])
+        
+    except Exception as e:
+        print(f"Error in extract_profile: {str(e)}")
+    # "years" stays None when experience could not be determined
+    return {"skills": skills or "", "years": years}
+
+@functools.lru_cache(maxsize=8)
+def _build_automaton(words: Tuple[str, ...]) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton matching the lowercased words"""
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word.lower(), (len(word.lower()), word))
+    automaton.make_automaton()
+    return automaton
+
+def _find_words(text: str, words: Tuple[str, ...]) -> Iterator[str]:
+    """Yield each of words that appears in text as a whole word, in order of appearance"""
+    if not words:
+        return
+    text = text.lower()
+    for end, (length, word) in _build_automaton(words).iter(text):
+        start = end - length + 1
+        # Skip matches inside longer words, e.g. "usa" in "jerusalem"
+        if (start > 0 and text[start - 1].isalnum()) or (end + 1 < len(text) and text[end + 1].isalnum()):
+            continue
+        yield word
+
+def match_country(query: str, country_list: List[str]) -> Optional[str]:
+    """Find the first country from country_list mentioned in query as a whole word"""
+    return next(_find_words(query, tuple(country_list)), None)
+
+def _normalize_location(text: str) -> str:
+    """Lowercase text and collapse punctuation, for exact country name lookups"""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+@functools.lru_cache(maxsize=8)
+def _build_country_map(countries: Tuple[str, ...]) -> Tuple[dict, int]:
+    """Map normalized country names to canonical ones, plus the longest name's word count"""
+    country_map = {_normalize_location(country): country for country in countries}
+    return country_map, max((len(name.split()) for name in country_map), default=0)
+
+def _country_from_text(text: str, country_list: List[str]) -> Optional[str]:
+    """Find the first country from country_list named in free text, by word n-gram lookup"""
+    country_map, max_words = _build_country_map(tuple(country_list))
+    tokens = _normalize_location(text).split()
+    for start in range(len(tokens)):
+        for size in range(1, min(max_words, len(tokens) - start) + 1):
+            country = country_map.get(" ".join(tokens[start:start + size]))
+            if country is not None:
+                return country
+    return None
+
+def _has_location_cue(query: str, skill_vocabulary: Tuple[str, ...] = ()) -> bool:
+    """Check whether a query appears to name a location
+
+    Words after "in"/"from"/"near" count unless they are common non-place words
+    or known skills from skill_vocabulary (e.g. "in python", "in machine learning").
+    """
+    if LOCATION_CUE_RE.search(query) or LOCATION_ALIAS_RE.search(query):
+        return True
+    skills = frozenset(skill_vocabulary)
+    for first, second in PLACE_NAME_RE.findall(query):
+        first, phrase = first.lower(), f"{first} {second}".lower().strip()
+        if first not in NON_PLACE_WORDS and first not in skills and phrase not in skills:
+            return True
+    return False
+
+async def extract_location_from_query(
+    query: str, country_list: List[str], skill_vocabulary: Tuple[str, ...] = ()
+) -> str:
+    """Extract location from query; skill_vocabulary keeps skills from being read as places"""
+    location = match_country(query, country_list)
+    if location is not None or not _has_location_cue(query, skill_vocabulary):
+        return location
+    # Fall back to the LLM for locations not named verbatim (e.g. "US" for "USA")
+    return await _extract_location_with_llm(query, country_list)
+
+async def _extract_location_with_llm(query: str, country_list: List[str]) -> str:
+    """Extract location from query using the LLM"""
     try:
         prompt = f"""
         Extract the location from this query:
@@ -132,24 +693,67 @@ def extract_location_from_query(query: str, country_list: List[str]) -> str:
         Return only the country name if found, or 'null' if no location is specified.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = await create_chat_completion(
+            model=EXTRACTION_MODEL,
             messages=[
                 {"role": "system", "content": "You are a hiring assistant that extracts locations from queries."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7
+            temperature=0,
+            max_tokens=16
         )
         
-        location = response.choices[0].message.content.strip()
-        return location if location.lower() != 'null' else None
+        # Only accept locations from the country list
+        return _country_from_text(response.choices[0].message.content, country_list)
         
     except Exception as e:
+        # Raised rather than returning None so callers can tell failure from "no location"
         print(f"Error in extract_location_from_query: {str(e)}")
+        raise
+
+def _experience_from_date_ranges(resume: str) -> Optional[int]:
+    """Sum the non-overlapping date ranges in a resume, or None if there are none"""
+    current_year = datetime.date.today().year
+    intervals = []
+    for match in YEAR_RANGE_RE.finditer(resume):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else current_year
+        if start <= end <= current_year:
+            intervals.append((start, end))
+    if not intervals:
         return None
 
-def get_experience_years(resume: str) -> str:
+    # Merge overlapping ranges so concurrent roles are not double counted
+    total = 0
+    merged_start, merged_end = None, None
+    for start, end in sorted(intervals):
+        if merged_end is not None and start <= merged_end:
+            merged_end = max(merged_end, end)
+            continue
+        if merged_end is not None:
+            total += merged_end - merged_start
+        merged_start, merged_end = start, end
+    return total + merged_end - merged_start
+
+def estimate_experience_years(resume: str) -> Optional[int]:
+    """Estimate years of experience from date ranges and stated years, without the LLM
+
+    Takes the larger of the two so that education dates or partially parsed
+    ranges cannot undercut an explicit "N years experience" statement.
+    """
+    estimates = [int(match.group(1)) for match in YEARS_STATED_RE.finditer(resume)]
+    from_ranges = _experience_from_date_ranges(resume)
+    if from_ranges is not None:
+        estimates.append(from_ranges)
+    return max(estimates) if estimates else None
+
+async def get_experience_years(resume: str) -> str:
     """Get estimated years of experience from resume"""
+    years = estimate_experience_years(resume)
+    if years is not None:
+        return str(years)
+
+    # Fall back to the LLM when the resume has no recognisable dates
     try:
         prompt = f"""
         Estimate the years of experience from this resume:
@@ -158,17 +762,73 @@ def get_experience_years(resume: str) -> str:
         Return only the number of years as a string.
         """
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        response = await create_chat_completion(
+            model=EXTRACTION_MODEL,
             messages=[
                 {"role": "system", "content": "You are a hiring assistant that estimates experience from resumes."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7
+            temperature=0,
+            max_tokens=64
         )
         
         return response.choices[0].message.content.strip()
         
     except Exception as e:
+        # Raised rather than returning "0" so callers can tell failure from no experience
         print(f"Error in get_experience_years: {str(e)}")
-        return "0"
\ No newline at end of file
+        raise
+
+def _candidate_profile(candidate: dict) -> str:
+    """Format a candidate record as a profile for LLM scoring"""
+    return (
+        f"Name: {candidate['Name']}\n"
+        f"Country: {candidate['Country']}\n"
+        f"Open To: {candidate['Open To']}\n"
+        f"Skills: {candidate['Skills']}\n"
+        f"Resume: {candidate['Resume']}"
+    )
+
+async def search_candidates(query: str) -> List[dict]:
+    """Search candidates for a recruiter query, best matches first
+
+    Candidates are first filtered cheaply by the query's country and by overlap
+    between the query and their precomputed skills; only the survivors are
+    scored, in batched LLM calls.
+    """
+    df = await load_candidates()
+    if df.empty:
+        return []
+    skill_vocabulary = await load_skill_vocabulary()
+
+    try:
+        location = await extract_location_from_query(query, load_countries(), skill_vocabulary)
+    except Exception:
+        # Search without a location filter rather than failing the whole search
+        location = None
+    pool = df if location is None else df[df['Country'] == location]
+
+    # Keep only candidates sharing a skill with the query, unless none do
+    query_skills = frozenset(_find_words(query, skill_vocabulary))
+    if query_skills:
+        overlaps = pool['SkillSet'].map(lambda skill_set: not skill_set.isdisjoint(query_skills))
+        if overlaps.any():
+            pool = pool[overlaps]
+
+    records = pool[['Name', 'Phone', 'Country', 'Open To', 'Email', 'Resume', 'Skills']].fillna('').to_dict('records')
+    scores = await score_candidates_batch(query, records)
+    candidates = [
+        {
+            "name": record['Name'],
+            "phone": record['Phone'],
+            "country": record['Country'],
+            "open_to": record['Open To'],
+            "email": record['Email'],
+            "resume": record['Resume'],
+            "score": score["score"],
+            "skills": score["skills"] or record['Skills'],
+            "explanation": score["explanation"]
+        }
+        for record, score in zip(records, scores)
+    ]
+    return sorted(candidates, key=lambda candidate: candidate["score"], reverse=True)
@@ -1,5 +1,7 @@
 import pandas as pd
 import os
+import functools
+import re
 from collections import Counter
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -10,10 +12,16 @@ load_dotenv()
 # Configure OpenAI
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
+@functools.lru_cache(maxsize=1)
+def read_resumes(path):
+    """Read the resume CSV (cached for the lifetime of the process)"""
+    return pd.read_csv(path)
+
 def load_resumes():
     """Load the resume data"""
     try:
-        df = pd.read_csv('Data/small_CV_DB.csv')
+        # Only successful reads are cached, so a failed read is retried next time
+        df = read_resumes(os.path.abspath('Data/small_CV_DB.csv'))
         return df
     except Exception as e:
         print(f"Error loading resume data: {str(e)}")
@@ -105,6 +113,13 @@ Skills:
     except Exception as e:
         return f"Error extracting skills: {str(e)}"
 
+@functools.lru_cache(maxsize=8)
+def build_country_map(countries):
+    """Map lowercased country names to canonical ones, plus the longest name's word count"""
+    country_map = {" ".join(re.findall(r"\w+", country.lower())): country for country in countries}
+    max_words = max((len(name.split()) for name in country_map), default=0)
+    return country_map, max_words
+
 def extract_location_from_query(query, country_list):
     """Extract location from query using LLM"""
     prompt = f"""
@@ -133,9 +148,13 @@ Return only the location name or null if none specified.
             return None
             
         # Check if the extracted location is in our country list
-        for country in country_list:
-            if country.lower() in response:
-                return country
+        country_map, max_words = build_country_map(tuple(country_list))
+        tokens = re.findall(r"\w+", response)
+        for start in range(len(tokens)):
+            for size in range(1, min(max_words, len(tokens) - start) + 1):
+                country = country_map.get(" ".join(tokens[start:start + size]))
+                if country is not None:
+                    return country
                 
         return None
     except Exception as e: